@@ -1,8 +1,16 @@
+import asyncio
 import os
+import pickle
 import random
+import re
+import sqlite3
 import datetime
 import time
+from collections import Counter
+from itertools import chain
+import orjson
 import spotipy
+from spotipy.cache_handler import CacheFileHandler
 from spotipy.oauth2 import SpotifyOAuth
 
 # =========================================================
@@ -21,18 +29,56 @@ if not all([CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, REFRESH_TOKEN]):
 
 SCOPE = "playlist-modify-private playlist-modify-public playlist-read-private"
 
+# Access token cache: per user, and outside the Actions-cached directory so
+# tokens are never uploaded. It only helps back-to-back local runs: on GitHub
+# Actions every job starts on a fresh runner, so the file never exists there
+# and each run refreshes as before.
+TOKEN_CACHE_PATH = os.path.expanduser("~/.cache/spotify-auto-playlists-auth/token.json")
+# A cached token is only reused if it outlives a whole run. One that expires
+# mid-run would be refreshed by several API threads at once, racing on the
+# cache file.
+TOKEN_MIN_LIFETIME_SEC = 20 * 60
+
 auth = SpotifyOAuth(
     client_id=CLIENT_ID,
     client_secret=CLIENT_SECRET,
     redirect_uri=REDIRECT_URI,
     scope=SCOPE,
+    cache_handler=CacheFileHandler(cache_path=TOKEN_CACHE_PATH),
 )
-# Inject refresh token and refresh once (non-interactive; works on GitHub Actions)
-auth.token_info = {"refresh_token": REFRESH_TOKEN}
-auth.refresh_access_token(REFRESH_TOKEN)
-
 sp = spotipy.Spotify(auth_manager=auth)
 
+
+def ensure_access_token():
+    """
+    Reuse the cached token if it belongs to REFRESH_TOKEN and has at least
+    TOKEN_MIN_LIFETIME_SEC left; otherwise inject the refresh token and
+    refresh once (non-interactive; works on GitHub Actions). Must run before
+    the first API call.
+    """
+    os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), mode=0o700, exist_ok=True)
+    cached = auth.cache_handler.get_cached_token()
+    if (
+        cached
+        and cached.get("refresh_token") == REFRESH_TOKEN
+        and cached.get("expires_at", 0) - time.time() >= TOKEN_MIN_LIFETIME_SEC
+    ):
+        return
+    auth.token_info = {"refresh_token": REFRESH_TOKEN}
+    auth.refresh_access_token(REFRESH_TOKEN)
+
+
+def _orjson_response_hook(response, *args, **kwargs):
+    # orjson.JSONDecodeError is a ValueError, which spotipy maps to None
+    # (e.g. for empty 201/204 bodies) just as with response.json()
+    response.json = lambda **_: orjson.loads(response.content)
+    return response
+
+
+# spotipy parses every response with response.json(); hook the session it
+# built (keeping its retry adapter) so that goes through orjson instead.
+sp._session.hooks["response"].append(_orjson_response_hook)
+
 # =========================================================
 # USER CONFIG
 # =========================================================
@@ -56,18 +102,163 @@ FAMOUS_MIN_TRACK_POPULARITY = 70
 MARKET_DEFAULT = "IL"
 MARKET_MAINSTREAM = "US"
 
+# Known/famous tiers: only search releases from the last N years (year: filter)
+MAINSTREAM_YEARS_BACK = 10
+
 # Rate limiting (prevents 429 loops). Keep conservative.
-MIN_DELAY_SEC = 0.12  # ~8 requests/sec
-_last_call_ts = 0.0
+RATE_LIMIT_PER_SEC = 8  # sustained requests/sec across all playlists
+RATE_LIMIT_BURST = 8    # requests allowed back-to-back once tokens build up
+MAX_IN_FLIGHT = 8       # concurrent Spotify requests across all playlists
+MAX_CONCURRENT_PLAYLISTS = 5
+
+# Local cache (kept between GitHub Actions runs by the workflow's cache step)
+CACHE_DIR = os.path.expanduser("~/.cache/spotify-auto-playlists")
+ARTIST_CACHE_FILE = os.path.join(CACHE_DIR, "artists.pkl")
+# Longer than the daily schedule, so a run that starts late still reuses the
+# previous run's lookups
+ARTIST_CACHE_TTL_SEC = 36 * 60 * 60
+SEED_STATS_FILE = os.path.join(CACHE_DIR, "seed_stats.pkl")
+TRACK_DB_FILE = os.path.join(CACHE_DIR, "tracks.sqlite")
+TRACK_DB_TTL_SEC = 14 * 24 * 60 * 60
+
+# Share of each playlist that may be filled from tracks accepted on earlier runs
+CACHED_TRACK_PERCENT = 0.50
+
+# Seed choice: share of picks made uniformly at random instead of by past yield
+SEED_EXPLORE_PERCENT = 0.10
+# Seed stats from earlier runs are scaled by this on load, so yields are
+# weighted towards recent runs
+SEED_STATS_DECAY = 0.7
+# Distinct seeds OR-ed into each search query (1 = one seed per search)
+SEEDS_PER_QUERY = 3
+
+
+class TokenBucket:
+    """
+    Async token bucket: refills `rate` tokens per second and holds at most
+    `burst`, so concurrent playlists can use the whole budget without being
+    spaced onto one fixed timeline.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+rate_limiter = TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+_api_slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+
+
+async def call_api(fn, *args, **kwargs):
+    """
+    Run a blocking spotipy call in a worker thread under the global rate limit.
+    spotipy already retries 429s and honours Retry-After.
+    """
+    async with _api_slots:
+        await rate_limiter.acquire()
+        return await asyncio.to_thread(fn, *args, **kwargs)
 
 
-def rate_limit():
-    global _last_call_ts
-    now = time.time()
-    wait = MIN_DELAY_SEC - (now - _last_call_ts)
-    if wait > 0:
-        time.sleep(wait)
-    _last_call_ts = time.time()
+# =========================================================
+# LOCAL CACHE (artist info, seed stats, accepted tracks; persisted across runs)
+# =========================================================
+ARTIST_CACHE = {}  # artist_id -> {"followers", "genres", "name", "fetched_at"}
+ARTIST_FIELDS = frozenset({"followers", "genres", "name", "fetched_at"})
+SEED_STATS = {}    # tier -> {seed: [accepted tracks, searches]}, decayed per run
+TRACK_DB = None    # sqlite3 connection to TRACK_DB_FILE, opened by load_local_cache()
+
+TRACK_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks(
+    uri TEXT PRIMARY KEY,
+    artist_id TEXT,
+    followers INT,
+    popularity INT,
+    is_hebrew INT,
+    is_indian INT,
+    title TEXT,
+    added_at REAL
+);
+CREATE INDEX IF NOT EXISTS tracks_followers ON tracks(followers, is_hebrew);
+"""
+
+
+def _load_pickle(path: str) -> dict:
+    """The pickled dict at `path`, or {} if it is missing or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            obj = pickle.load(f)
+    except Exception:  # a bad cache file must not stop the run
+        return {}
+    return obj if isinstance(obj, dict) else {}
+
+
+def _save_pickle(path: str, obj):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(obj, f)
+
+
+def load_local_cache():
+    global TRACK_DB
+    cutoff = time.time() - ARTIST_CACHE_TTL_SEC
+    ARTIST_CACHE.update({
+        aid: a for aid, a in _load_pickle(ARTIST_CACHE_FILE).items()
+        if isinstance(a, dict) and ARTIST_FIELDS <= a.keys() and a["fetched_at"] >= cutoff
+    })
+    for tier, stats in _load_pickle(SEED_STATS_FILE).items():
+        try:
+            SEED_STATS[tier] = {
+                seed: [accepts * SEED_STATS_DECAY, attempts * SEED_STATS_DECAY]
+                for seed, (accepts, attempts) in stats.items()
+            }
+        except (AttributeError, TypeError, ValueError):
+            continue  # malformed tier: start it over
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    TRACK_DB = sqlite3.connect(TRACK_DB_FILE)
+    TRACK_DB.executescript(TRACK_DB_SCHEMA)
+    TRACK_DB.execute("DELETE FROM tracks WHERE added_at < ?", (time.time() - TRACK_DB_TTL_SEC,))
+
+
+def save_local_cache():
+    _save_pickle(ARTIST_CACHE_FILE, ARTIST_CACHE)
+    _save_pickle(SEED_STATS_FILE, SEED_STATS)
+    TRACK_DB.commit()
+    TRACK_DB.close()
+
+
+def sample_cached_tracks(min_followers, max_followers, min_popularity, limit: int) -> list:
+    """
+    Random previously accepted tracks that fit a tier, as
+    (uri, artist_id, title, is_hebrew, is_indian) rows.
+    """
+    return TRACK_DB.execute(
+        "SELECT uri, artist_id, title, is_hebrew, is_indian FROM tracks "
+        "WHERE followers >= ? AND (? IS NULL OR followers <= ?) AND popularity >= ? "
+        "ORDER BY RANDOM() LIMIT ?",
+        (min_followers or 0, max_followers, max_followers, min_popularity or 0, limit),
+    ).fetchall()
+
+
+def store_track(uri, artist_id, followers, popularity, is_hebrew, is_indian, title):
+    TRACK_DB.execute(
+        "INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (uri, artist_id, followers, popularity, int(is_hebrew), int(is_indian), title, time.time()),
+    )
 
 
 # =========================================================
@@ -106,31 +297,27 @@ MAINSTREAM_SEEDS = [
 # =========================================================
 # DIVERSITY / FILTER HELPERS
 # =========================================================
-def is_hebrew_text(text: str) -> bool:
-    return any("\u0590" <= ch <= "\u05FF" for ch in text)
+HEB_SET = frozenset(map(chr, range(0x0590, 0x0600)))
 
 
-def is_hebrew_track(track) -> bool:
-    if is_hebrew_text(track.get("name", "")):
-        return True
-    album = track.get("album") or {}
-    if is_hebrew_text(album.get("name", "")):
-        return True
-    for a in track.get("artists") or []:
-        if is_hebrew_text(a.get("name", "")):
-            return True
-    return False
+def _build_bad_version_re():
+    patterns = []
+    if FILTER_LIVE:
+        patterns += [r"[ (]live", r"session"]
+    if FILTER_REMIX:
+        patterns += [r"remix", r"[ (]mix"]
+    if FILTER_KARAOKE:
+        patterns += [r"karaoke", r"instrumental"]
+    return re.compile("|".join(patterns), re.IGNORECASE) if patterns else None
+
+
+BAD_VERSION_RE = _build_bad_version_re()
 
 
 def is_bad_version(name: str) -> bool:
-    n = (name or "").lower()
-    if FILTER_LIVE and (" live" in n or "(live" in n or "session" in n):
-        return True
-    if FILTER_REMIX and ("remix" in n or " mix" in n or "(mix" in n):
-        return True
-    if FILTER_KARAOKE and ("karaoke" in n or "instrumental" in n):
-        return True
-    return False
+    if BAD_VERSION_RE is None:
+        return False
+    return BAD_VERSION_RE.search(name or "") is not None
 
 
 # Indian detection (practical heuristic)
@@ -141,126 +328,302 @@ INDIAN_GENRE_KEYWORDS = {
 }
 
 
-def has_indic_script(text: str) -> bool:
-    if not text:
-        return False
-    return any(
-        ("\u0900" <= ch <= "\u097F") or  # Devanagari
-        ("\u0980" <= ch <= "\u09FF") or  # Bengali
-        ("\u0A00" <= ch <= "\u0A7F") or  # Gurmukhi
-        ("\u0A80" <= ch <= "\u0AFF") or  # Gujarati
-        ("\u0B80" <= ch <= "\u0BFF") or  # Tamil
-        ("\u0C00" <= ch <= "\u0C7F") or  # Telugu
-        ("\u0C80" <= ch <= "\u0CFF") or  # Kannada
-        ("\u0D00" <= ch <= "\u0D7F")     # Malayalam
-        for ch in text
-    )
+INDIC_SET = frozenset(map(chr, chain(
+    range(0x0900, 0x0980),  # Devanagari
+    range(0x0980, 0x0A00),  # Bengali
+    range(0x0A00, 0x0A80),  # Gurmukhi
+    range(0x0A80, 0x0B00),  # Gujarati
+    range(0x0B80, 0x0C00),  # Tamil
+    range(0x0C00, 0x0C80),  # Telugu
+    range(0x0C80, 0x0D00),  # Kannada
+    range(0x0D00, 0x0D80),  # Malayalam
+)))
 
 
-def is_indian_track(track, artist_obj) -> bool:
-    if has_indic_script(track.get("name", "")):
-        return True
+def classify_track(track):
+    """
+    Returns (is_hebrew, has_indic_script) from a single pass over the track,
+    album and artist names.
+    """
     album = track.get("album") or {}
-    if has_indic_script(album.get("name", "")):
-        return True
-    if has_indic_script(artist_obj.get("name", "")):
+    blob = "\0".join([
+        track.get("name", "") or "",
+        album.get("name", "") or "",
+        *((a.get("name", "") or "") for a in track.get("artists") or []),
+    ])
+    return not HEB_SET.isdisjoint(blob), not INDIC_SET.isdisjoint(blob)
+
+
+def is_indian_track(indic_script: bool, artist_obj) -> bool:
+    if indic_script:
         return True
     genres = " ".join(artist_obj.get("genres", [])).lower()
     return any(k in genres for k in INDIAN_GENRE_KEYWORDS)
 
 
-def pick_seed(require_hebrew: bool, mainstream: bool) -> str:
+def pick_seed(tier, require_hebrew: bool, mainstream: bool) -> str:
+    """
+    Epsilon-greedy: mostly favour seeds that yielded accepted tracks for this
+    tier before, sometimes pick uniformly to keep exploring.
+    """
     if require_hebrew:
-        return random.choice(HEBREW_SEEDS)
-    return random.choice(MAINSTREAM_SEEDS if mainstream else OBSCURE_SEEDS)
+        seeds = HEBREW_SEEDS
+    else:
+        seeds = MAINSTREAM_SEEDS if mainstream else OBSCURE_SEEDS
+    if random.random() < SEED_EXPLORE_PERCENT:
+        return random.choice(seeds)
+    stats = SEED_STATS.get(tier, {})
+    weights = []
+    for seed in seeds:
+        accepts, attempts = stats.get(seed, (0, 0))
+        weights.append(max(1, 10 * accepts / (attempts + 1)))
+    return random.choices(seeds, weights=weights)[0]
+
+
+def pick_seeds(tier, require_hebrew: bool, mainstream: bool, k: int = SEEDS_PER_QUERY) -> list:
+    """k distinct seeds, each chosen by pick_seed (every pool has more than k)."""
+    seeds = []
+    while len(seeds) < k:
+        seed = pick_seed(tier, require_hebrew, mainstream)
+        if seed not in seeds:
+            seeds.append(seed)
+    return seeds
+
+
+def record_seed(tier, seed: str, accepted: int):
+    stats = SEED_STATS.setdefault(tier, {}).setdefault(seed, [0, 0])
+    stats[0] += accepted
+    stats[1] += 1
+
+
+def seed_credits(seeds: list, accepted_titles: list) -> Counter:
+    """
+    Seeds that shared one query split its accepted tracks: each title counts
+    for the seeds it contains, or for all of them if it contains none (the
+    match was on the artist or album).
+    """
+    credits = Counter()
+    for title in accepted_titles:
+        title = title.lower()
+        credits.update([s for s in seeds if s in title] or seeds)
+    return credits
 
 
 # =========================================================
 # SPOTIFY API HELPERS (BATCHED)
 # =========================================================
-def batch_search_tracks(seed: str, market: str) -> list:
+SEARCH_TOTALS = {}  # (query, market) -> total results Spotify reported
+
+
+async def batch_search_tracks(seeds: list, market: str, filters: str = "") -> list:
     """
-    Fetch up to 50 tracks in one API call.
-    Also remove some unwanted versions at the query level.
+    Fetch up to 50 tracks matching any of the seeds in one API call.
+    `filters` adds field qualifiers (e.g. "year:2016-2026"), and some
+    unwanted versions are removed at the query level.
+    The random offset stays within the result count Spotify last reported
+    for the query, so narrow queries don't keep landing on empty pages.
     """
-    offset = random.randint(0, 900)
-    q = f'{seed} -live -karaoke -instrumental -remix'
-    rate_limit()
-    res = sp.search(q=q, type="track", limit=50, offset=offset, market=market)
-    return res.get("tracks", {}).get("items", []) or []
+    # Filters and exclusions are repeated on every OR-ed seed: whichever way
+    # the search groups OR, each result still has to pass all of them.
+    clause = " ".join(filter(None, [filters, "-live -karaoke -instrumental -remix"]))
+    q = " OR ".join(f"{seed} {clause}" for seed in seeds)
+    key = (q, market)
+    items = []
+    for _ in range(2):
+        total = SEARCH_TOTALS.get(key)
+        max_offset = 900 if total is None else max(0, min(900, total - 50))
+        offset = random.randint(0, max_offset)
+        res = await call_api(sp.search, q=q, type="track", limit=50, offset=offset, market=market)
+        found = res.get("tracks", {}) or {}
+        items = found.get("items", []) or []
+        SEARCH_TOTALS[key] = found.get("total") or 0
+        # a first probe with an unknown total may overshoot; retry once within it
+        if items or total is not None or not SEARCH_TOTALS[key]:
+            break
+    return items
 
 
-def batch_fetch_artist_info(artist_ids: list) -> dict:
+class ArtistBatcher:
     """
-    Fetch follower counts + genres + names for up to 50 artists in one request.
+    Coalesces artist lookups from all concurrently running playlists into
+    shared /artists calls of up to 50 IDs. Repeated lookups of an ID that is
+    already queued share one future.
     """
-    # de-dupe but keep <= 50
-    uniq = []
-    seen = set()
-    for aid in artist_ids:
-        if aid and aid not in seen:
-            seen.add(aid)
-            uniq.append(aid)
-        if len(uniq) >= 50:
-            break
 
-    rate_limit()
-    artists = sp.artists(uniq).get("artists", []) or []
-    info = {}
-    for a in artists:
-        info[a["id"]] = {
-            "followers": (a.get("followers") or {}).get("total", 999999),
-            "genres": a.get("genres", []) or [],
-            "name": a.get("name", "") or "",
-        }
-    return info
+    def __init__(self, max_batch: int = 50, window_sec: float = 0.02):
+        self.max_batch = max_batch
+        self.window_sec = window_sec
+        self._queue = asyncio.Queue()
+        self._pending = {}  # artist_id -> future resolving to the artist object (or None)
+        self._worker = None
+
+    async def get(self, artist_id: str):
+        fut = self._pending.get(artist_id)
+        if fut is None:
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[artist_id] = fut
+            self._queue.put_nowait(artist_id)
+            if self._worker is None or self._worker.done():
+                self._worker = asyncio.create_task(self._run())
+        return await asyncio.shield(fut)
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # short window so lookups from other playlists can join this call
+            await asyncio.sleep(self.window_sec)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                res = await call_api(sp.artists, batch)
+                if not isinstance(res, dict):
+                    raise ValueError(f"unexpected /artists response: {res!r}")
+                found = {a["id"]: a for a in res.get("artists", []) or [] if a}
+                for aid in batch:
+                    self._pending.pop(aid).set_result(found.get(aid))
+            except Exception as e:
+                # never leave callers waiting on this batch
+                for aid in batch:
+                    fut = self._pending.pop(aid, None)
+                    if fut is not None and not fut.done():
+                        fut.set_exception(e)
+
+
+ARTIST_BATCHER = ArtistBatcher()
+
+
+async def batch_fetch_artist_info(artist_ids: list) -> dict:
+    """
+    Fetch follower counts + genres + names via ARTIST_BATCHER.
+    Expects de-duplicated IDs; artists already in ARTIST_CACHE are not
+    fetched again.
+    """
+    missing = [aid for aid in artist_ids if aid and aid not in ARTIST_CACHE]
+    if missing:
+        artists = await asyncio.gather(*(ARTIST_BATCHER.get(aid) for aid in missing))
+        now = time.time()
+        for a in artists:
+            if not a:
+                continue
+            ARTIST_CACHE[a["id"]] = {
+                "followers": (a.get("followers") or {}).get("total", 999999),
+                "genres": a.get("genres", []) or [],
+                "name": a.get("name", "") or "",
+                "fetched_at": now,
+            }
+    return {aid: ARTIST_CACHE[aid] for aid in artist_ids if aid in ARTIST_CACHE}
 
 
 # =========================================================
 # TRACK GENERATION
 # =========================================================
-def generate_tracks_for_playlist(max_followers, min_followers):
-    hebrew_needed = int(TRACK_COUNT * HEBREW_PERCENT)
-    global_needed = TRACK_COUNT - hebrew_needed
-
-    hebrew_tracks = []
-    global_tracks = []
-
-    # Diversity controls
-    artist_counts = {}          # artist_id -> count (max MAX_SONGS_PER_ARTIST)
-    seen_uris = set()           # avoid duplicate tracks
-    seen_artist_title = set()   # avoid same artist + same title duplicates
-
-    # Indian cap
-    max_indian = int(TRACK_COUNT * MAX_INDIAN_PERCENT)
-    indian_count = 0
-
-    # Mainstream mode for known/famous tiers
-    mainstream_mode = (min_followers is not None and min_followers >= 50000)
-    market = MARKET_MAINSTREAM if mainstream_mode else MARKET_DEFAULT
-
-    # For famous tiers, enforce min track popularity
-    min_popularity = None
-    if mainstream_mode:
-        min_popularity = FAMOUS_MIN_TRACK_POPULARITY if (min_followers and min_followers >= 500000) else KNOWN_MIN_TRACK_POPULARITY
-
-    while len(hebrew_tracks) < hebrew_needed or len(global_tracks) < global_needed:
-        need_hebrew_now = len(hebrew_tracks) < hebrew_needed
-        seed = pick_seed(require_hebrew=need_hebrew_now, mainstream=mainstream_mode)
-
-        batch = batch_search_tracks(seed, market=market)
-        if not batch:
-            continue
+class PlaylistBuilder:
+    """
+    Builds one tier's track list: Hebrew/global quotas, diversity rules and
+    the Indian cap, filled first from the local track pool and then by
+    searching. Accepted URIs are kept uniformly shuffled in `tracks`.
+    """
 
-        artist_ids = [t["artists"][0]["id"] for t in batch if t and t.get("artists")]
-        artist_map = batch_fetch_artist_info(artist_ids)
+    def __init__(self, max_followers, min_followers):
+        self.max_followers = max_followers
+        self.min_followers = min_followers
+
+        hebrew_needed = int(TRACK_COUNT * HEBREW_PERCENT)
+        self.quota = {True: hebrew_needed, False: TRACK_COUNT - hebrew_needed}  # is_hebrew -> tracks needed
+        self.lang_counts = Counter()  # is_hebrew -> tracks accepted
+        self.tracks = []
+
+        # Diversity controls
+        self.artist_counts = Counter()   # artist_id -> count (max MAX_SONGS_PER_ARTIST)
+        self.seen_uris = set()           # avoid duplicate tracks
+        self.seen_artist_title = set()   # avoid same artist + same title duplicates
+
+        # Indian cap
+        self.max_indian = int(TRACK_COUNT * MAX_INDIAN_PERCENT)
+        self.indian_count = 0
+
+        # Mainstream mode for known/famous tiers
+        self.mainstream = (min_followers is not None and min_followers >= 50000)
+        self.market = MARKET_MAINSTREAM if self.mainstream else MARKET_DEFAULT
+
+        # Recent releases skew popular, so let the server drop old catalogue.
+        # Global searches only: Hebrew tracks are scarce in the US market already.
+        self.global_filters = ""
+        if self.mainstream:
+            this_year = datetime.date.today().year
+            self.global_filters = f"year:{this_year - MAINSTREAM_YEARS_BACK}-{this_year}"
+
+        # For famous tiers, enforce min track popularity
+        self.min_popularity = None
+        if self.mainstream:
+            self.min_popularity = FAMOUS_MIN_TRACK_POPULARITY if (min_followers and min_followers >= 500000) else KNOWN_MIN_TRACK_POPULARITY
+
+        # Seed stats are learned per follower tier
+        self.tier = (min_followers, max_followers)
+
+    def is_full(self, is_hebrew: bool) -> bool:
+        return self.lang_counts[is_hebrew] >= self.quota[is_hebrew]
+
+    def try_accept(self, uri, artist_id, title, track_is_hebrew, indian_flag) -> bool:
+        """Apply the diversity/quota rules and add the track if it passes."""
+        if uri in self.seen_uris:
+            return False
+
+        # max 3 songs per artist
+        if self.artist_counts[artist_id] >= MAX_SONGS_PER_ARTIST:
+            return False
+
+        # avoid same artist + same title (common with variants)
+        title_key = (artist_id, title.lower())
+        if title_key in self.seen_artist_title:
+            return False
+
+        # enforce Hebrew/global quotas strictly
+        if self.is_full(track_is_hebrew):
+            return False
+
+        # cap Indian content
+        if indian_flag and self.indian_count >= self.max_indian:
+            return False
+
+        # ACCEPT
+        self.seen_uris.add(uri)
+        self.seen_artist_title.add(title_key)
+        self.artist_counts[artist_id] += 1
+        if indian_flag:
+            self.indian_count += 1
+        self.lang_counts[track_is_hebrew] += 1
+
+        # inside-out Fisher-Yates: swap the new track into a random slot
+        j = random.randint(0, len(self.tracks))
+        self.tracks.append(uri)
+        self.tracks[-1], self.tracks[j] = self.tracks[j], self.tracks[-1]
+        return True
 
+    def fill_from_cache(self):
+        """Reuse part of the playlist from tracks accepted on earlier runs."""
+        cached_limit = int(TRACK_COUNT * CACHED_TRACK_PERCENT)
+        for uri, artist_id, title, is_heb, is_ind in sample_cached_tracks(
+            self.min_followers, self.max_followers, self.min_popularity, TRACK_COUNT * 2
+        ):
+            if len(self.tracks) >= cached_limit:
+                break
+            self.try_accept(uri, artist_id, title, bool(is_heb), bool(is_ind))
+
+    def prefilter(self, batch: list, want_hebrew: bool) -> list:
+        """
+        Pass 1: checks that need no artist data, so doomed tracks never cost
+        an /artists lookup. Returns
+        (uri, title, artist_id, track_is_hebrew, indic_script, popularity) tuples.
+        """
+        candidates = []
         for track in batch:
             if not track or not track.get("artists"):
                 continue
 
             uri = track.get("uri")
-            if not uri or uri in seen_uris:
+            if not uri or uri in self.seen_uris:
                 continue
 
             title = (track.get("name") or "").strip()
@@ -268,98 +631,126 @@ def generate_tracks_for_playlist(max_followers, min_followers):
                 continue
 
             artist_id = track["artists"][0].get("id")
-            if not artist_id:
+            if not artist_id or self.artist_counts[artist_id] >= MAX_SONGS_PER_ARTIST:
                 continue
-
-            # max 3 songs per artist
-            c = artist_counts.get(artist_id, 0)
-            if c >= MAX_SONGS_PER_ARTIST:
+            if (artist_id, title.lower()) in self.seen_artist_title:
                 continue
 
-            # avoid same artist + same title (common with variants)
-            title_key = (artist_id, title.lower())
-            if title_key in seen_artist_title:
+            # the other language is handled by the other producer
+            track_is_hebrew, indic_script = classify_track(track)
+            if track_is_hebrew != want_hebrew:
                 continue
 
-            track_is_hebrew = is_hebrew_track(track)
-
-            # enforce Hebrew/global quotas strictly
-            if track_is_hebrew:
-                if len(hebrew_tracks) >= hebrew_needed:
-                    continue
-            else:
-                if len(global_tracks) >= global_needed:
-                    continue
+            # famous/known tiers: require popular tracks too
+            popularity = track.get("popularity") or 0
+            if self.min_popularity is not None and popularity < self.min_popularity:
+                continue
 
+            candidates.append((uri, title, artist_id, track_is_hebrew, indic_script, popularity))
+        return candidates
+
+    def accept_candidates(self, candidates: list, artist_map: dict, want_hebrew: bool) -> list:
+        """
+        Pass 2: artist-based checks, then the diversity rules again since
+        earlier candidates (or the other producer) may have used them up.
+        Returns the titles of the accepted tracks.
+        """
+        accepted = []
+        for uri, title, artist_id, track_is_hebrew, indic_script, popularity in candidates:
             artist_obj = artist_map.get(artist_id, {"followers": 999999, "genres": [], "name": ""})
             followers = artist_obj["followers"]
 
             # follower constraints
-            if max_followers is not None and followers > max_followers:
+            if self.max_followers is not None and followers > self.max_followers:
                 continue
-            if min_followers is not None and followers < min_followers:
+            if self.min_followers is not None and followers < self.min_followers:
                 continue
 
-            # famous/known tiers: require popular tracks too
-            if min_popularity is not None:
-                if (track.get("popularity") or 0) < min_popularity:
-                    continue
-
-            # cap Indian content
-            indian_flag = is_indian_track(track, artist_obj)
-            if indian_flag and indian_count >= max_indian:
+            indian_flag = is_indian_track(indic_script, artist_obj)
+            if not self.try_accept(uri, artist_id, title, track_is_hebrew, indian_flag):
                 continue
+            store_track(uri, artist_id, followers, popularity, track_is_hebrew, indian_flag, title)
+            accepted.append(title)
 
-            # ACCEPT
-            seen_uris.add(uri)
-            seen_artist_title.add(title_key)
-            artist_counts[artist_id] = c + 1
-            if indian_flag:
-                indian_count += 1
-
-            if track_is_hebrew:
-                hebrew_tracks.append(uri)
-            else:
-                global_tracks.append(uri)
-
-            if len(hebrew_tracks) >= hebrew_needed and len(global_tracks) >= global_needed:
+            if self.is_full(want_hebrew):
                 break
-
-    final_tracks = hebrew_tracks + global_tracks
-    random.shuffle(final_tracks)
-    return final_tracks
+        return accepted
+
+    def _start_search(self, want_hebrew: bool):
+        seeds = pick_seeds(self.tier, require_hebrew=want_hebrew, mainstream=self.mainstream)
+        filters = "" if want_hebrew else self.global_filters
+        return seeds, asyncio.create_task(batch_search_tracks(seeds, market=self.market, filters=filters))
+
+    async def collect(self, want_hebrew: bool):
+        """Search until the Hebrew (or global) quota is met, using only that seed pool."""
+        if self.is_full(want_hebrew):
+            return
+
+        # Double-buffered: the next search is in flight while the current batch
+        # waits on its artist lookup and gets filtered.
+        pending_search = self._start_search(want_hebrew)
+        try:
+            while not self.is_full(want_hebrew):
+                seeds, search_task = pending_search
+                batch = await search_task
+                pending_search = self._start_search(want_hebrew)
+
+                candidates = self.prefilter(batch, want_hebrew)
+                accepted = []
+                if candidates:
+                    artist_ids = list(dict.fromkeys(artist_id for _, _, artist_id, _, _, _ in candidates))
+                    artist_map = await batch_fetch_artist_info(artist_ids)
+                    accepted = self.accept_candidates(candidates, artist_map, want_hebrew)
+                credits = seed_credits(seeds, accepted)
+                for seed in seeds:
+                    record_seed(self.tier, seed, credits[seed])
+        finally:
+            # also on error: cancel the prefetch and consume its outcome so
+            # it is neither leaked nor logged as an unretrieved exception
+            pending_search[1].cancel()
+            await asyncio.gather(pending_search[1], return_exceptions=True)
+
+
+async def generate_tracks_for_playlist(max_followers, min_followers):
+    builder = PlaylistBuilder(max_followers, min_followers)
+    builder.fill_from_cache()
+
+    # Hebrew and global producers run side by side; each stops at its own
+    # quota. If one fails, stop the other rather than leave it running.
+    producers = [asyncio.create_task(builder.collect(want_hebrew=h)) for h in (True, False)]
+    try:
+        await asyncio.gather(*producers)
+    finally:
+        for task in producers:
+            task.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+
+    return builder.tracks
 
 
 # =========================================================
 # PLAYLIST MANAGEMENT
 # =========================================================
-def find_or_create_playlist(user_id: str, name: str) -> str:
-    rate_limit()
-    playlists = sp.user_playlists(user_id, limit=50)
+async def find_or_create_playlist(user_id: str, name: str) -> str:
+    playlists = await call_api(sp.user_playlists, user_id, limit=50)
     for p in playlists.get("items", []) or []:
         if (p.get("name") or "").lower() == name.lower():
             return p["id"]
-    rate_limit()
-    new_pl = sp.user_playlist_create(user_id, name, public=False)
+    new_pl = await call_api(sp.user_playlist_create, user_id, name, public=False)
     return new_pl["id"]
 
 
-def clear_playlist(pid: str):
-    rate_limit()
-    sp.playlist_replace_items(pid, [])
-
-
-def process_playlist(user_id: str, name: str, limits: dict, timestamp: str):
+async def process_playlist(user_id: str, name: str, limits: dict, timestamp: str):
     max_f = limits["max"]
     min_f = limits["min"]
 
-    pid = find_or_create_playlist(user_id, name)
-    clear_playlist(pid)
+    pid = await find_or_create_playlist(user_id, name)
 
-    tracks = generate_tracks_for_playlist(max_f, min_f)
+    # Build the list first and swap it in with one call, so a tier that fails
+    # mid-generation leaves its old playlist untouched.
+    tracks = await generate_tracks_for_playlist(max_f, min_f)
 
-    rate_limit()
-    sp.playlist_add_items(pid, tracks)
+    await call_api(sp.playlist_replace_items, pid, tracks)
 
     description = (
         f"Auto-updated at {timestamp}. "
@@ -371,25 +762,46 @@ def process_playlist(user_id: str, name: str, limits: dict, timestamp: str):
         f"Max {MAX_SONGS_PER_ARTIST} songs/artist."
     )
 
-    rate_limit()
-    sp.playlist_change_details(pid, description=description)
+    await call_api(sp.playlist_change_details, pid, description=description)
 
     print(f"Updated: {name} ({len(tracks)} tracks)")
 
 
 # =========================================================
-# MAIN (SEQUENTIAL: avoids rate-limit hangs)
+# MAIN (CONCURRENT: all playlists share one rate limit)
 # =========================================================
-def main():
-    rate_limit()
-    user_id = sp.current_user()["id"]
+async def main():
+    ensure_access_token()
+    load_local_cache()
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    for name, limits in PLAYLISTS.items():
-        process_playlist(user_id, name, limits, timestamp)
+    # Bounded pool: extra playlists wait for a slot instead of piling more
+    # requests onto the shared rate limit.
+    playlist_slots = asyncio.Semaphore(MAX_CONCURRENT_PLAYLISTS)
+
+    try:
+        user_id = (await call_api(sp.current_user))["id"]
+
+        async def run_one(name, limits):
+            async with playlist_slots:
+                await process_playlist(user_id, name, limits, timestamp)
+
+        # return_exceptions: one failing tier must not cancel the others
+        results = await asyncio.gather(
+            *(run_one(name, limits) for name, limits in PLAYLISTS.items()),
+            return_exceptions=True,
+        )
+    finally:
+        save_local_cache()
+
+    failed = [(name, r) for name, r in zip(PLAYLISTS, results) if isinstance(r, BaseException)]
+    for name, err in failed:
+        print(f"FAILED: {name}: {err!r}")
+    if failed:
+        raise SystemExit(f"{len(failed)} of {len(PLAYLISTS)} playlists failed to update")
 
     print("\nAll playlists updated!")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import random
+import sys
+
+import pytest
+
+# playlist_generator refuses to import without these; no network call is made
+# until main() runs ensure_access_token().
+for var in ("SPOTIPY_CLIENT_ID", "SPOTIPY_CLIENT_SECRET", "SPOTIPY_REDIRECT_URI", "SPOTIPY_REFRESH_TOKEN"):
+    os.environ.setdefault(var, "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import playlist_generator as pg  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch, tmp_path):
+    """
+    Each test runs its own event loop, so give it fresh loop-bound primitives,
+    empty in-memory caches and a private cache directory.
+    """
+    monkeypatch.setattr(pg, "rate_limiter", pg.TokenBucket(1000, 1000))
+    monkeypatch.setattr(pg, "_api_slots", asyncio.Semaphore(pg.MAX_IN_FLIGHT))
+    monkeypatch.setattr(pg, "ARTIST_BATCHER", pg.ArtistBatcher())
+    monkeypatch.setattr(pg, "ARTIST_CACHE", {})
+    monkeypatch.setattr(pg, "SEED_STATS", {})
+    monkeypatch.setattr(pg, "SEARCH_TOTALS", {})
+
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(pg, "CACHE_DIR", cache_dir)
+    monkeypatch.setattr(pg, "ARTIST_CACHE_FILE", os.path.join(cache_dir, "artists.pkl"))
+    monkeypatch.setattr(pg, "SEED_STATS_FILE", os.path.join(cache_dir, "seed_stats.pkl"))
+    monkeypatch.setattr(pg, "TRACK_DB_FILE", os.path.join(cache_dir, "tracks.sqlite"))
+    monkeypatch.setattr(pg, "TRACK_DB", None)
+
+
+@pytest.fixture
+def seeded_random():
+    """Seeds the global RNG playlist_generator draws from, and restores it afterwards."""
+    state = random.getstate()
+    random.seed(0)
+    yield
+    random.setstate(state)
+
+
+class FakeSpotify:
+    """Stands in for spotipy.Spotify: records calls and serves canned data."""
+
+    def __init__(self, followers=100, fail_markets=()):
+        self.followers = followers
+        self.fail_markets = set(fail_markets)
+        self.calls = []
+        self.replaced = {}  # playlist id -> items written
+        self._next_track = 0
+
+    def search(self, q, type, limit, offset, market):
+        self.calls.append(("search", q))
+        if market in self.fail_markets:
+            raise RuntimeError("search failed")
+        hebrew = any("\u0590" <= ch <= "\u05ff" for ch in q)
+        items = []
+        for _ in range(limit):
+            self._next_track += 1
+            n = self._next_track
+            items.append({
+                "uri": f"spotify:track:{n}",
+                "name": f"{'שיר' if hebrew else 'song'} {n}",
+                "popularity": 90,
+                "album": {"name": "album"},
+                "artists": [{"id": f"artist{n}", "name": f"artist {n}"}],
+            })
+        return {"tracks": {"total": 1000, "items": items}}
+
+    def artists(self, ids):
+        self.calls.append(("artists", list(ids)))
+        return {"artists": [
+            {"id": i, "name": i, "followers": {"total": self.followers}, "genres": []}
+            for i in ids
+        ]}
+
+    def current_user(self):
+        return {"id": "user"}
+
+    def user_playlists(self, user_id, limit):
+        return {"items": []}
+
+    def user_playlist_create(self, user_id, name, public):
+        return {"id": name}
+
+    def playlist_replace_items(self, pid, items):
+        self.replaced[pid] = list(items)
+
+    def playlist_change_details(self, pid, description):
+        pass
+
+
+@pytest.fixture
+def fake_sp(monkeypatch):
+    """Installs a FakeSpotify as playlist_generator.sp; call with FakeSpotify's arguments."""
+    def install(**kwargs):
+        fake = FakeSpotify(**kwargs)
+        monkeypatch.setattr(pg, "sp", fake)
+        return fake
+    return install
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+import playlist_generator as pg
+
+
+def test_batcher_coalesces_concurrent_lookups(fake_sp):
+    fake = fake_sp()
+    ids = [f"a{i}" for i in range(60)]
+
+    async def run():
+        return await asyncio.gather(*(pg.ARTIST_BATCHER.get(i) for i in ids + ids[:10]))
+
+    results = asyncio.run(run())
+
+    assert [r["id"] for r in results] == ids + ids[:10]
+    batches = [c[1] for c in fake.calls if c[0] == "artists"]
+    assert [len(b) for b in batches] == [50, 10]
+    assert sorted(sum(batches, [])) == sorted(ids)  # duplicates share one lookup
+
+
+def test_lookups_from_different_playlists_share_calls(fake_sp):
+    fake = fake_sp()
+
+    async def run():
+        # two tiers asking at once, with overlapping artists
+        return await asyncio.gather(
+            pg.batch_fetch_artist_info([f"a{i}" for i in range(0, 20)]),
+            pg.batch_fetch_artist_info([f"a{i}" for i in range(10, 30)]),
+        )
+
+    first, second = asyncio.run(run())
+    assert len(first) == len(second) == 20
+    assert [len(c[1]) for c in fake.calls if c[0] == "artists"] == [30]
+
+    # a later lookup is served from ARTIST_CACHE without another call
+    asyncio.run(pg.batch_fetch_artist_info(["a5", "a25"]))
+    assert len([c for c in fake.calls if c[0] == "artists"]) == 1
+
+
+@pytest.mark.parametrize("bad_response", [None, {"artists": [{"name": "no id"}]}])
+def test_batcher_failure_fails_waiters_and_keeps_serving(fake_sp, monkeypatch, bad_response):
+    fake = fake_sp()
+    responses = [bad_response]
+    real_artists = fake.artists
+    monkeypatch.setattr(fake, "artists", lambda ids: responses.pop() if responses else real_artists(ids))
+
+    async def run():
+        with pytest.raises((ValueError, KeyError)):
+            await asyncio.wait_for(pg.ARTIST_BATCHER.get("a1"), 2)
+        return await asyncio.wait_for(pg.ARTIST_BATCHER.get("a2"), 2)
+
+    assert asyncio.run(run())["id"] == "a2"
+
+
+def test_batcher_restarts_dead_worker(fake_sp):
+    fake_sp()
+
+    async def run():
+        await pg.ARTIST_BATCHER.get("a1")
+        worker = pg.ARTIST_BATCHER._worker
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        return await asyncio.wait_for(pg.ARTIST_BATCHER.get("a2"), 2)
+
+    assert asyncio.run(run())["id"] == "a2"
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+from spotipy.cache_handler import CacheFileHandler
+
+import playlist_generator as pg
+
+
+@pytest.fixture
+def token_cache(monkeypatch, tmp_path):
+    """Points the token cache at tmp_path and records refresh calls instead of making them."""
+    (tmp_path / "auth").mkdir()
+    path = str(tmp_path / "auth" / "token.json")
+    handler = CacheFileHandler(cache_path=path)
+    refreshes = []
+    monkeypatch.setattr(pg, "TOKEN_CACHE_PATH", path)
+    monkeypatch.setattr(pg.auth, "cache_handler", handler)
+    monkeypatch.setattr(pg.auth, "refresh_access_token", refreshes.append)
+    return handler, refreshes
+
+
+def cache_token(handler, expires_in, refresh_token=pg.REFRESH_TOKEN):
+    handler.save_token_to_cache({
+        "access_token": "cached",
+        "refresh_token": refresh_token,
+        "expires_at": int(time.time()) + expires_in,
+    })
+
+
+def test_fresh_cached_token_is_reused(token_cache):
+    handler, refreshes = token_cache
+    cache_token(handler, expires_in=3600)
+
+    pg.ensure_access_token()
+    assert refreshes == []
+
+
+@pytest.mark.parametrize("expires_in", [-10, 120, pg.TOKEN_MIN_LIFETIME_SEC - 60])
+def test_token_that_would_expire_mid_run_is_refreshed(token_cache, expires_in):
+    handler, refreshes = token_cache
+    cache_token(handler, expires_in)
+
+    pg.ensure_access_token()
+    assert refreshes == [pg.REFRESH_TOKEN]
+
+
+def test_token_for_another_refresh_token_is_refreshed(token_cache):
+    handler, refreshes = token_cache
+    cache_token(handler, expires_in=3600, refresh_token="someone else")
+
+    pg.ensure_access_token()
+    assert refreshes == [pg.REFRESH_TOKEN]
+
+
+def test_missing_cache_is_refreshed(token_cache):
+    _, refreshes = token_cache
+
+    pg.ensure_access_token()
+    assert refreshes == [pg.REFRESH_TOKEN]
+    assert pg.auth.token_info == {"refresh_token": pg.REFRESH_TOKEN}
@@ -0,0 +1,46 @@
+import pytest
+
+import playlist_generator as pg
+
+
+def old_is_bad_version(name):
+    """The substring chain is_bad_version replaced, with every filter on."""
+    n = (name or "").lower()
+    return any(s in n for s in (
+        " live", "(live", "session",
+        "remix", " mix", "(mix",
+        "karaoke", "instrumental",
+    ))
+
+
+@pytest.mark.parametrize("title", [
+    "Song", "Song - Live", "Song (Live at Wembley)", "Live Forever", "Alive",
+    "Deliver", "Session", "BBC Sessions", "Song - Remix", "REMIX", "Song (Mix)",
+    "Radio Mix", "Remixed", "Mixtape", "Karaoke Version", "Instrumental",
+    "שיר - Live", "", None,
+])
+def test_bad_version_regex_matches_old_substring_rules(title):
+    assert pg.is_bad_version(title) == old_is_bad_version(title)
+
+
+@pytest.mark.parametrize("track, expected", [
+    ({"name": "Song", "album": {"name": "Album"}, "artists": [{"name": "Band"}]}, (False, False)),
+    ({"name": "שיר", "album": {"name": "Album"}, "artists": [{"name": "Band"}]}, (True, False)),
+    ({"name": "Song", "album": {"name": "אלבום"}, "artists": [{"name": "Band"}]}, (True, False)),
+    ({"name": "Song", "album": {"name": "Album"}, "artists": [{"name": "x"}, {"name": "गायक"}]}, (False, True)),
+    ({"name": "பாடல் שיר", "album": None, "artists": []}, (True, True)),
+    ({"name": None, "album": {"name": None}, "artists": [{"name": None}]}, (False, False)),
+    ({}, (False, False)),
+])
+def test_classify_track_checks_track_album_and_artist_names(track, expected):
+    assert pg.classify_track(track) == expected
+
+
+def test_classify_track_script_ranges():
+    def names(text):
+        return pg.classify_track({"name": text})
+
+    assert names("֐") == names("׿") == (True, False)
+    assert names("֏")[0] is False and names("؀")[0] is False
+    assert names("ऀ") == names("ൿ") == (False, True)
+    assert names("଀") == (False, False)  # Oriya is not in the Indic set
@@ -0,0 +1,100 @@
+import os
+import pickle
+import time
+
+import pytest
+
+import playlist_generator as pg
+
+
+def artist(fetched_at):
+    return {"followers": 100, "genres": [], "name": "x", "fetched_at": fetched_at}
+
+
+def write_artist_cache(entries):
+    os.makedirs(pg.CACHE_DIR, exist_ok=True)
+    with open(pg.ARTIST_CACHE_FILE, "wb") as f:
+        pickle.dump(entries, f)
+
+
+# =========================================================
+# Artist cache
+# =========================================================
+def test_artist_cache_keeps_only_entries_within_ttl():
+    now = time.time()
+    write_artist_cache({
+        "yesterday-late": artist(now - 26 * 60 * 60),  # previous run started later than this one
+        "expired": artist(now - pg.ARTIST_CACHE_TTL_SEC - 1),
+    })
+
+    pg.load_local_cache()
+    assert set(pg.ARTIST_CACHE) == {"yesterday-late"}
+    pg.save_local_cache()
+
+
+@pytest.mark.parametrize("contents", [b"", b"not a pickle", pickle.dumps(["a", "list"])])
+def test_unreadable_artist_cache_is_ignored(contents):
+    os.makedirs(pg.CACHE_DIR, exist_ok=True)
+    with open(pg.ARTIST_CACHE_FILE, "wb") as f:
+        f.write(contents)
+
+    pg.load_local_cache()
+    assert pg.ARTIST_CACHE == {}
+    pg.save_local_cache()
+
+
+def test_malformed_artist_entries_are_dropped():
+    write_artist_cache({
+        "ok": artist(time.time()),
+        "no-timestamp": {"followers": 100, "genres": [], "name": "x"},
+        "no-followers": {"genres": [], "name": "x", "fetched_at": time.time()},
+        "not-a-dict": 5,
+    })
+
+    pg.load_local_cache()
+    assert set(pg.ARTIST_CACHE) == {"ok"}
+    pg.save_local_cache()
+
+
+# =========================================================
+# Track pool
+# =========================================================
+def test_sample_cached_tracks_respects_tier_bounds():
+    pg.load_local_cache()
+    rows = [(50, 10), (200, 10), (500, 80), (1000, 60), (5000, 90)]
+    for i, (followers, popularity) in enumerate(rows):
+        pg.store_track(f"u{i}", f"a{i}", followers, popularity, False, False, f"t{i}")
+
+    def uris(min_f, max_f, min_pop):
+        return sorted(r[0] for r in pg.sample_cached_tracks(min_f, max_f, min_pop, 100))
+
+    assert uris(200, 1000, None) == ["u1", "u2", "u3"]
+    assert uris(1000, None, None) == ["u3", "u4"]
+    assert uris(0, None, 70) == ["u2", "u4"]
+    pg.save_local_cache()
+
+
+def test_old_cached_tracks_are_evicted_on_load():
+    pg.load_local_cache()
+    pg.store_track("old", "a1", 100, 50, False, False, "old")
+    pg.store_track("new", "a2", 100, 50, False, False, "new")
+    pg.TRACK_DB.execute("UPDATE tracks SET added_at = ? WHERE uri = 'old'", (time.time() - pg.TRACK_DB_TTL_SEC - 1,))
+    pg.save_local_cache()
+
+    pg.load_local_cache()
+    assert [r[0] for r in pg.sample_cached_tracks(0, None, None, 10)] == ["new"]
+    pg.save_local_cache()
+
+
+def test_cached_tracks_fill_at_most_their_share():
+    pg.load_local_cache()
+    for i in range(pg.TRACK_COUNT * 2):
+        pg.store_track(f"u{i}", f"a{i}", 100, 50, i % 3 == 0, False, f"t{i}")
+    pg.store_track("too-big", "big", 5000, 50, False, False, "big")
+
+    builder = pg.PlaylistBuilder(max_followers=200, min_followers=0)
+    builder.fill_from_cache()
+
+    assert len(builder.tracks) == int(pg.TRACK_COUNT * pg.CACHED_TRACK_PERCENT)
+    assert "too-big" not in builder.tracks
+    pg.save_local_cache()
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+import playlist_generator as pg
+
+
+@pytest.fixture
+def two_tiers(monkeypatch):
+    monkeypatch.setattr(pg, "ensure_access_token", lambda: None)
+    monkeypatch.setattr(pg, "PLAYLISTS", {
+        "Unknown": {"max": 200, "min": 0},
+        "Famous": {"max": None, "min": 500000},
+    })
+
+
+def stored_uris():
+    with sqlite3.connect(pg.TRACK_DB_FILE) as db:
+        return {uri for uri, in db.execute("SELECT uri FROM tracks")}
+
+
+def test_failing_tier_does_not_touch_other_playlists(fake_sp, two_tiers):
+    fake = fake_sp(followers=100, fail_markets={pg.MARKET_MAINSTREAM})
+
+    with pytest.raises(SystemExit, match="1 of 2"):
+        asyncio.run(pg.main())
+
+    # the failing tier never wrote; the other one was filled in a single replace
+    assert list(fake.replaced) == ["Unknown"]
+    assert len(set(fake.replaced["Unknown"])) == pg.TRACK_COUNT
+    # and the tracks it accepted were still saved for the next run
+    assert set(fake.replaced["Unknown"]) <= stored_uris()
+
+
+def test_local_cache_is_saved_when_startup_fails(fake_sp, two_tiers, monkeypatch):
+    fake = fake_sp()
+
+    def no_user():
+        raise RuntimeError("current_user failed")
+
+    monkeypatch.setattr(fake, "current_user", no_user)
+    with pytest.raises(RuntimeError, match="current_user failed"):
+        asyncio.run(pg.main())
+
+    assert os.path.exists(pg.ARTIST_CACHE_FILE)
+    assert os.path.exists(pg.SEED_STATS_FILE)
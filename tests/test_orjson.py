@@ -0,0 +1,58 @@
+import pytest
+import requests
+import spotipy
+
+import playlist_generator as pg
+
+
+class CannedAdapter(requests.adapters.BaseAdapter):
+    """Answers every request with one fixed status and body."""
+
+    def __init__(self, status, body):
+        super().__init__()
+        self.status = status
+        self.body = body
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = self.body
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def canned_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    return pg._orjson_response_hook(response)
+
+
+def test_hook_is_installed_on_the_spotipy_session():
+    assert pg._orjson_response_hook in pg.sp._session.hooks["response"]
+
+
+def test_hook_parses_with_orjson():
+    assert canned_response(b'{"id": "x", "n": [1, 2]}').json() == {"id": "x", "n": [1, 2]}
+
+
+@pytest.mark.parametrize("body", [b"", b"not json"])
+def test_hook_raises_value_error_like_requests(body):
+    with pytest.raises(ValueError):
+        canned_response(body).json()
+
+
+@pytest.mark.parametrize("status, body, expected", [
+    (200, b'{"id": "user"}', {"id": "user"}),
+    (201, b"", None),  # e.g. playlist_change_details
+])
+def test_spotipy_results_through_the_hook(status, body, expected):
+    client = spotipy.Spotify(auth="token", retries=0)
+    client._session.mount("https://", CannedAdapter(status, body))
+    client._session.hooks["response"].append(pg._orjson_response_hook)
+
+    assert client.current_user() == expected
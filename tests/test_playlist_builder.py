@@ -0,0 +1,94 @@
+import asyncio
+from collections import Counter
+
+import playlist_generator as pg
+
+
+def test_try_accept_enforces_quota_and_diversity():
+    builder = pg.PlaylistBuilder(max_followers=None, min_followers=0)
+
+    for i in range(pg.MAX_SONGS_PER_ARTIST):
+        assert builder.try_accept(f"u{i}", "same-artist", f"title {i}", False, False)
+    assert not builder.try_accept("u-extra", "same-artist", "another title", False, False)
+
+    assert not builder.try_accept("u0", "other-artist", "dup uri", False, False)
+    assert builder.try_accept("v0", "artist-v", "Song", False, False)
+    assert not builder.try_accept("v1", "artist-v", "song", False, False)  # same artist + title
+
+    for i in range(builder.quota[True]):
+        assert builder.try_accept(f"h{i}", f"heb{i}", "שיר", True, False)
+    assert builder.is_full(True)
+    assert not builder.try_accept("h-extra", "heb-extra", "שיר", True, False)
+
+    for i in range(builder.max_indian):
+        assert builder.try_accept(f"i{i}", f"ind{i}", "song", False, True)
+    assert not builder.try_accept("i-extra", "ind-extra", "song", False, True)
+
+
+def track(n, name="song", popularity=90, artist=None):
+    return {
+        "uri": f"spotify:track:{n}",
+        "name": f"{name} {n}",
+        "popularity": popularity,
+        "album": {"name": "album"},
+        "artists": [{"id": artist or f"artist{n}", "name": "artist"}],
+    }
+
+
+def test_prefilter_drops_tracks_that_need_no_artist_lookup():
+    builder = pg.PlaylistBuilder(max_followers=None, min_followers=500000)  # famous: min popularity
+    builder.try_accept("spotify:track:1", "artist1", "taken", False, False)
+    for i in range(pg.MAX_SONGS_PER_ARTIST):
+        builder.try_accept(f"full{i}", "busy", f"title {i}", False, False)
+
+    batch = [
+        None,
+        track(1),                         # already accepted
+        track(2, name="Song - Live"),     # bad version
+        track(3, name="שיר"),             # Hebrew, wanted by the other producer
+        track(4, popularity=10),          # below the tier's popularity floor
+        track(5, artist="busy"),          # artist already at MAX_SONGS_PER_ARTIST
+        track(6),
+    ]
+
+    assert [c[0] for c in builder.prefilter(batch, want_hebrew=False)] == ["spotify:track:6"]
+
+
+def test_doomed_batches_cost_no_artist_lookup(fake_sp, monkeypatch):
+    fake = fake_sp()
+    searches = []
+    real_search = fake.search
+
+    def search(**kwargs):
+        res = real_search(**kwargs)
+        if not searches:  # the first batch is all live versions
+            for t in res["tracks"]["items"]:
+                t["name"] += " - Live"
+        searches.append(res)
+        return res
+
+    monkeypatch.setattr(fake, "search", search)
+
+    builder = pg.PlaylistBuilder(max_followers=None, min_followers=0)
+    pg.load_local_cache()
+    asyncio.run(builder.collect(want_hebrew=False))
+    pg.save_local_cache()
+
+    doomed = {t["artists"][0]["id"] for t in searches[0]["tracks"]["items"]}
+    looked_up = {aid for call, ids in fake.calls if call == "artists" for aid in ids}
+    assert looked_up and not looked_up & doomed
+
+
+def test_try_accept_keeps_tracks_uniformly_shuffled(monkeypatch, seeded_random):
+    monkeypatch.setattr(pg, "TRACK_COUNT", 3)
+    monkeypatch.setattr(pg, "HEBREW_PERCENT", 0)
+
+    orders = Counter()
+    for _ in range(6000):
+        builder = pg.PlaylistBuilder(max_followers=None, min_followers=0)
+        for uri in "abc":
+            assert builder.try_accept(uri, f"artist-{uri}", uri, False, False)
+        orders["".join(builder.tracks)] += 1
+
+    assert len(orders) == 6
+    assert all(800 < n < 1200 for n in orders.values())
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+import playlist_generator as pg
+
+
+def test_token_bucket_allows_burst_then_holds_rate():
+    bucket = pg.TokenBucket(rate=50, burst=5)
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        burst = time.monotonic() - start
+        for _ in range(5):
+            await bucket.acquire()
+        return burst, time.monotonic() - start
+
+    burst, total = asyncio.run(run())
+    assert burst < 0.05
+    assert total >= 0.08  # 5 more tokens at 50/s take ~0.1s
+
+
+def test_token_bucket_shares_burst_across_concurrent_callers():
+    bucket = pg.TokenBucket(rate=10, burst=8)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(8)))
+        return time.monotonic() - start
+
+    # the old fixed spacing would have taken 0.7s for eight calls at 10/s
+    assert asyncio.run(run()) < 0.05
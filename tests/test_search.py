@@ -0,0 +1,73 @@
+import asyncio
+
+import playlist_generator as pg
+
+
+def test_every_ored_seed_carries_filters_and_exclusions(fake_sp):
+    fake = fake_sp()
+
+    asyncio.run(pg.batch_search_tracks(["love", "you"], market="US", filters="year:2016-2026"))
+
+    [(_, q)] = fake.calls
+    clauses = q.split(" OR ")
+    assert [c.split()[0] for c in clauses] == ["love", "you"]
+    for clause in clauses:
+        assert clause.split()[1:] == ["year:2016-2026", "-live", "-karaoke", "-instrumental", "-remix"]
+
+
+def paged_search(fake, monkeypatch, total):
+    """Serves `total` results in pages and records the offsets asked for."""
+    offsets = []
+
+    def search(q, type, limit, offset, market):
+        offsets.append(offset)
+        items = [{"uri": f"u{i}"} for i in range(offset, min(offset + limit, total))]
+        return {"tracks": {"total": total, "items": items}}
+
+    monkeypatch.setattr(fake, "search", search)
+    return offsets
+
+
+def test_offsets_stay_within_reported_total(fake_sp, monkeypatch, seeded_random):
+    offsets = paged_search(fake_sp(), monkeypatch, total=120)
+
+    async def run():
+        return [await pg.batch_search_tracks(["qz"], market="IL") for _ in range(30)]
+
+    batches = asyncio.run(run())
+
+    # after the first probe every offset is within min(900, total - 50)
+    assert all(o <= 70 for o in offsets[1:])
+    assert all(batches[1:])
+
+
+def test_empty_first_probe_retries_once_within_total(fake_sp, monkeypatch):
+    offsets = paged_search(fake_sp(), monkeypatch, total=30)
+    monkeypatch.setattr(pg.random, "randint", lambda a, b: b)  # worst case: highest offset
+
+    items = asyncio.run(pg.batch_search_tracks(["qz"], market="IL"))
+
+    assert offsets == [900, 0]
+    assert len(items) == 30
+
+
+def test_no_retry_when_nothing_matches(fake_sp, monkeypatch):
+    offsets = paged_search(fake_sp(), monkeypatch, total=0)
+
+    assert asyncio.run(pg.batch_search_tracks(["qz"], market="IL")) == []
+    assert len(offsets) == 1
+
+
+def test_year_filter_only_on_global_searches(fake_sp):
+    fake = fake_sp()
+    builder = pg.PlaylistBuilder(max_followers=None, min_followers=500000)
+
+    async def run():
+        for want_hebrew in (True, False):
+            _, task = builder._start_search(want_hebrew)
+            await task
+
+    asyncio.run(run())
+    hebrew_q, global_q = (q for _, q in fake.calls)
+    assert "year:" not in hebrew_q
+    assert builder.global_filters and builder.global_filters in global_q
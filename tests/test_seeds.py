@@ -0,0 +1,67 @@
+import os
+import pickle
+from collections import Counter
+
+import pytest
+
+import playlist_generator as pg
+
+TIER = (0, 200)
+
+
+def test_pick_seed_favours_seeds_with_past_yield(seeded_random):
+    good = pg.OBSCURE_SEEDS[3]
+    pg.SEED_STATS[TIER] = {good: [50, 10]}
+
+    picks = Counter(pg.pick_seed(TIER, require_hebrew=False, mainstream=False) for _ in range(3000))
+
+    assert set(picks) == set(pg.OBSCURE_SEEDS)  # the others still get picked
+    assert picks[good] > 0.6 * 3000
+    assert pg.pick_seed((1, 2), require_hebrew=True, mainstream=False) in pg.HEBREW_SEEDS
+
+
+def test_pick_seed_explores_uniformly(seeded_random, monkeypatch):
+    monkeypatch.setattr(pg, "SEED_EXPLORE_PERCENT", 1.0)
+    pg.SEED_STATS[TIER] = {pg.OBSCURE_SEEDS[0]: [50, 10]}
+
+    picks = Counter(pg.pick_seed(TIER, require_hebrew=False, mainstream=False) for _ in range(3000))
+    assert max(picks.values()) < 2 * min(picks.values())
+
+
+def test_record_seed_counts_accepts_and_attempts():
+    pg.record_seed(TIER, "qz", 3)
+    pg.record_seed(TIER, "qz", 0)
+    assert pg.SEED_STATS == {TIER: {"qz": [3, 2]}}
+
+
+def test_seed_stats_decay_on_load():
+    os.makedirs(pg.CACHE_DIR, exist_ok=True)
+    with open(pg.SEED_STATS_FILE, "wb") as f:
+        pickle.dump({TIER: {"qz": [10, 20]}, (1, 2): "malformed"}, f)
+
+    pg.load_local_cache()
+    accepts, attempts = pg.SEED_STATS[TIER]["qz"]
+    assert (accepts, attempts) == pytest.approx((10 * pg.SEED_STATS_DECAY, 20 * pg.SEED_STATS_DECAY))
+    assert (1, 2) not in pg.SEED_STATS
+    pg.save_local_cache()
+
+    # each further run shrinks old counts again
+    pg.SEED_STATS.clear()
+    pg.load_local_cache()
+    assert pg.SEED_STATS[TIER]["qz"][1] == pytest.approx(20 * pg.SEED_STATS_DECAY ** 2)
+    pg.save_local_cache()
+
+
+def test_pick_seeds_returns_distinct_seeds(seeded_random):
+    pg.SEED_STATS[TIER] = {pg.OBSCURE_SEEDS[0]: [1000, 1]}  # one seed dominates
+
+    for _ in range(50):
+        seeds = pg.pick_seeds(TIER, require_hebrew=False, mainstream=False, k=3)
+        assert len(set(seeds)) == 3
+        assert set(seeds) <= set(pg.OBSCURE_SEEDS)
+
+
+def test_seed_credits_split_accepts_by_title():
+    credits = pg.seed_credits(["love", "you", "2024"], ["Love You", "Only Love", "Hello"])
+    # "Hello" contains no seed, so the match was elsewhere: every seed shares it
+    assert credits == {"love": 3, "you": 2, "2024": 1}